@@ -1,19 +1,23 @@
 from __future__ import annotations
 
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Final
 from io import BytesIO
-from PIL import Image
 import streamlit as st
 import subprocess
 import sysconfig
-import requests
-import struct
+import tempfile
+import hashlib
 import base64
+import struct
 import shutil
 import pydoc
-import yaml
 import stat
+import time
 import sys
 import re
 import os
@@ -23,7 +27,15 @@ st.set_page_config(page_title="LabConstrictor",
                    layout="wide",
                    )
 
-MAX_FILE_SIZE_MB = 25
+MAX_FILE_SIZE_MB: Final[int] = 25
+MAX_FILE_SIZE_BYTES: Final[int] = MAX_FILE_SIZE_MB * 1024 * 1024
+UPLOAD_FIELDS: Final[tuple[tuple[str, str], ...]] = (
+    ("Icon", "icon_uploaded"),
+    ("Welcome", "welcome_uploaded"),
+    ("Headers", "headers_uploaded"),
+)
+# Clones are cached here between submissions and sessions, one folder per repository URL
+REPO_CACHE_DIR: Final[Path] = Path(tempfile.gettempdir()) / "labconstrictor_repos"
 
 if "ready_for_pr" not in st.session_state:
     st.session_state["ready_for_pr"] = False
@@ -34,6 +46,12 @@ if "update_upload_queue" not in st.session_state:
 if "update_upload_form_key" not in st.session_state:
     st.session_state["update_upload_form_key"] = 0
 
+GITHUB_REPO_PATTERN = re.compile(r"github\.com[:/]([^/]+)/([^/]+?)(?:\.git)?/?$")
+GITHUB_REPO_URL_PATTERN = re.compile(r"^https://github\.com/[^/]+/[^/]+/?$")
+PROJECT_NAME_PATTERN = re.compile(r"^[A-Za-z0-9 _.-]+$")
+SEMVER_PATTERN = re.compile(r"^\d+\.\d+\.\d+(-[0-9A-Za-z-.]+)?(\+[0-9A-Za-z-.]+)?$")
+FIXED_DEPENDENCY_PATTERN = re.compile(r"^[a-zA-Z0-9_.-]+==[a-zA-Z0-9_.-]+$")
+
 VIEW_WELCOME = "welcome"
 VIEW_INITIALIZE = "initialize"
 VIEW_UPDATE = "update"
@@ -41,58 +59,77 @@ VIEW_UPDATE = "update"
 if "active_view" not in st.session_state:
     st.session_state["active_view"] = VIEW_WELCOME
 
-st.session_state["stdlib_modules"] = ['__future__', '__hello__', '__phello__', '_abc', '_aix_support', '_android_support', 
-                                      '_apple_support', '_ast', '_bisect', '_blake2', '_codecs', '_codecs_cn', '_codecs_hk', 
-                                      '_codecs_iso2022', '_codecs_jp', '_codecs_kr', '_codecs_tw', '_collections', 
-                                      '_collections_abc', '_colorize', '_compat_pickle', '_compression', '_contextvars', 
-                                      '_csv', '_datetime', '_functools', '_heapq', '_imp', '_interpchannels', '_interpqueues', 
-                                      '_interpreters', '_io', '_ios_support', '_json', '_locale', '_lsprof', '_markupbase', 
-                                      '_md5', '_multibytecodec', '_opcode', '_opcode_metadata', '_operator', '_osx_support', 
-                                      '_pickle', '_py_abc', '_pydatetime', '_pydecimal', '_pyio', '_pylong', '_pyrepl', 
-                                      '_random', '_sha1', '_sha2', '_sha3', '_signal', '_sitebuiltins', '_sre', '_stat', 
-                                      '_statistics', '_string', '_strptime', '_struct', '_suggestions', '_symtable', '_sysconfig', 
-                                      '_thread', '_threading_local', '_tokenize', '_tracemalloc', '_typing', '_warnings', '_weakref', 
-                                      '_weakrefset', '_winapi', 'abc', 'antigravity', 'argparse', 'array', 'ast', 'asyncio', 
-                                      'atexit', 'base64', 'bdb', 'binascii', 'bisect', 'builtins', 'bz2', 'cProfile', 'calendar', 
-                                      'cmath', 'cmd', 'code', 'codecs', 'codeop', 'collections', 'colorsys', 'compileall', 
-                                      'concurrent', 'configparser', 'contextlib', 'contextvars', 'copy', 'copyreg', 'csv', 
-                                      'ctypes', 'curses', 'dataclasses', 'datetime', 'dbm', 'decimal', 'difflib', 'dis', 
-                                      'doctest', 'email', 'encodings', 'ensurepip', 'enum', 'errno', 'faulthandler', 'filecmp', 
-                                      'fileinput', 'fnmatch', 'fractions', 'ftplib', 'functools', 'gc', 'genericpath', 'getopt', 
-                                      'getpass', 'gettext', 'glob', 'graphlib', 'gzip', 'hashlib', 'heapq', 'hmac', 'html', 'http', 
-                                      'idlelib', 'imaplib', 'importlib', 'inspect', 'io', 'ipaddress', 'itertools', 'json', 'keyword', 
-                                      'linecache', 'locale', 'logging', 'lzma', 'mailbox', 'marshal', 'math', 'mimetypes', 'mmap', 
-                                      'modulefinder', 'msvcrt', 'multiprocessing', 'netrc', 'nt', 'ntpath', 'nturl2path', 'numbers', 
-                                      'opcode', 'operator', 'optparse', 'os', 'pathlib', 'pdb', 'pickle', 'pickletools', 'pkgutil', 
-                                      'platform', 'plistlib', 'poplib', 'posixpath', 'pprint', 'profile', 'pstats', 'pty', 'py_compile', 
-                                      'pyclbr', 'pydoc', 'pydoc_data', 'queue', 'quopri', 'random', 're', 'reprlib', 'rlcompleter', 
-                                      'runpy', 'sched', 'secrets', 'selectors', 'shelve', 'shlex', 'shutil', 'signal', 'site', 
-                                      'smtplib', 'socket', 'socketserver', 'sqlite3', 'sre_compile', 'sre_constants', 'sre_parse', 
-                                      'ssl', 'stat', 'statistics', 'string', 'stringprep', 'struct', 'subprocess', 'symtable', 
-                                      'sys', 'sysconfig', 'tabnanny', 'tarfile', 'tempfile', 'test', 'textwrap', 'this', 'threading', 
-                                      'time', 'timeit', 'tkinter', 'token', 'tokenize', 'tomllib', 'trace', 'traceback', 'tracemalloc', 
-                                      'tty', 'turtle', 'turtledemo', 'types', 'typing', 'unittest', 'urllib', 'uuid', 'venv', 'warnings', 
-                                      'wave', 'weakref', 'webbrowser', 'winreg', 'wsgiref', 'xml', 'xmlrpc', 'xxsubtype', 'zipapp', 
-                                      'zipfile', 'zipimport', 'zlib', 'zoneinfo']
+@st.cache_resource(show_spinner=False)
+def get_stdlib_modules_lower():
+    """Lowercased names of the standard library modules, built once per process rather than on every rerun."""
+    stdlib_modules = ['__future__', '__hello__', '__phello__', '_abc', '_aix_support', '_android_support', 
+                      '_apple_support', '_ast', '_bisect', '_blake2', '_codecs', '_codecs_cn', '_codecs_hk', 
+                      '_codecs_iso2022', '_codecs_jp', '_codecs_kr', '_codecs_tw', '_collections', 
+                      '_collections_abc', '_colorize', '_compat_pickle', '_compression', '_contextvars', 
+                      '_csv', '_datetime', '_functools', '_heapq', '_imp', '_interpchannels', '_interpqueues', 
+                      '_interpreters', '_io', '_ios_support', '_json', '_locale', '_lsprof', '_markupbase', 
+                      '_md5', '_multibytecodec', '_opcode', '_opcode_metadata', '_operator', '_osx_support', 
+                      '_pickle', '_py_abc', '_pydatetime', '_pydecimal', '_pyio', '_pylong', '_pyrepl', 
+                      '_random', '_sha1', '_sha2', '_sha3', '_signal', '_sitebuiltins', '_sre', '_stat', 
+                      '_statistics', '_string', '_strptime', '_struct', '_suggestions', '_symtable', '_sysconfig', 
+                      '_thread', '_threading_local', '_tokenize', '_tracemalloc', '_typing', '_warnings', '_weakref', 
+                      '_weakrefset', '_winapi', 'abc', 'antigravity', 'argparse', 'array', 'ast', 'asyncio', 
+                      'atexit', 'base64', 'bdb', 'binascii', 'bisect', 'builtins', 'bz2', 'cProfile', 'calendar', 
+                      'cmath', 'cmd', 'code', 'codecs', 'codeop', 'collections', 'colorsys', 'compileall', 
+                      'concurrent', 'configparser', 'contextlib', 'contextvars', 'copy', 'copyreg', 'csv', 
+                      'ctypes', 'curses', 'dataclasses', 'datetime', 'dbm', 'decimal', 'difflib', 'dis', 
+                      'doctest', 'email', 'encodings', 'ensurepip', 'enum', 'errno', 'faulthandler', 'filecmp', 
+                      'fileinput', 'fnmatch', 'fractions', 'ftplib', 'functools', 'gc', 'genericpath', 'getopt', 
+                      'getpass', 'gettext', 'glob', 'graphlib', 'gzip', 'hashlib', 'heapq', 'hmac', 'html', 'http', 
+                      'idlelib', 'imaplib', 'importlib', 'inspect', 'io', 'ipaddress', 'itertools', 'json', 'keyword', 
+                      'linecache', 'locale', 'logging', 'lzma', 'mailbox', 'marshal', 'math', 'mimetypes', 'mmap', 
+                      'modulefinder', 'msvcrt', 'multiprocessing', 'netrc', 'nt', 'ntpath', 'nturl2path', 'numbers', 
+                      'opcode', 'operator', 'optparse', 'os', 'pathlib', 'pdb', 'pickle', 'pickletools', 'pkgutil', 
+                      'platform', 'plistlib', 'poplib', 'posixpath', 'pprint', 'profile', 'pstats', 'pty', 'py_compile', 
+                      'pyclbr', 'pydoc', 'pydoc_data', 'queue', 'quopri', 'random', 're', 'reprlib', 'rlcompleter', 
+                      'runpy', 'sched', 'secrets', 'selectors', 'shelve', 'shlex', 'shutil', 'signal', 'site', 
+                      'smtplib', 'socket', 'socketserver', 'sqlite3', 'sre_compile', 'sre_constants', 'sre_parse', 
+                      'ssl', 'stat', 'statistics', 'string', 'stringprep', 'struct', 'subprocess', 'symtable', 
+                      'sys', 'sysconfig', 'tabnanny', 'tarfile', 'tempfile', 'test', 'textwrap', 'this', 'threading', 
+                      'time', 'timeit', 'tkinter', 'token', 'tokenize', 'tomllib', 'trace', 'traceback', 'tracemalloc', 
+                      'tty', 'turtle', 'turtledemo', 'types', 'typing', 'unittest', 'urllib', 'uuid', 'venv', 'warnings', 
+                      'wave', 'weakref', 'webbrowser', 'winreg', 'wsgiref', 'xml', 'xmlrpc', 'xxsubtype', 'zipapp', 
+                      'zipfile', 'zipimport', 'zlib', 'zoneinfo']
+    return frozenset(name.lower() for name in stdlib_modules)
 
 def set_active_view(view_name: str):
     st.session_state["active_view"] = view_name
 
 def validate_repo_format(repo_url):
     """Validate that the repository URL is in the correct format."""
-    pattern = r"^https://github\.com/[^/]+/[^/]+/?$"
-    if re.match(pattern, repo_url):
+    if GITHUB_REPO_URL_PATTERN.match(repo_url):
         return True
     return False
 
+def parse_github_repo(repo_url):
+    """Return the (owner, name) pair of a GitHub repository URL, without any '.git' suffix."""
+    match = GITHUB_REPO_PATTERN.search(repo_url.strip())
+    if not match:
+        raise ValueError(f"'{repo_url}' is not a GitHub repository URL.")
+    return match.group(1), match.group(2)
+
 def to_python_project_name(project_name: str) -> str:
     return project_name.lower().replace(" ", "_").replace("-", "_").replace(".", "_")
 
+def yaml_safe_classes():
+    """Return the safe (Loader, Dumper) pair, preferring the libyaml C bindings that PyYAML wheels ship with."""
+    # yaml is imported where YAML is processed, so a process that only renders the form never loads it
+    import yaml
+    return getattr(yaml, "CSafeLoader", yaml.SafeLoader), getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
 def validate_requirements(uploaded_requirements):
+    import yaml
+
     # First read the requirements.yaml content
     try:
         content = uploaded_requirements.read().decode("utf-8")
-        data = yaml.safe_load(content)
+        yaml_loader, _ = yaml_safe_classes()
+        data = yaml.load(content, Loader=yaml_loader)
         if not isinstance(data, dict) or "dependencies" not in data:
             return False, "The requirements file must contain a 'dependencies' key with a list of dependencies."
         dependencies = data["dependencies"]
@@ -103,17 +140,17 @@ def validate_requirements(uploaded_requirements):
                 return False, f"Dependency '{dep}' is not a string."
             else:
                 # Only allow fixed version dependencies in the format 'package==version'
-                if not re.match(r"^[a-zA-Z0-9_.-]+==[a-zA-Z0-9_.-]+$", dep):
+                if not FIXED_DEPENDENCY_PATTERN.match(dep):
                     return False, f"Dependency '{dep}' is not in the correct format. Only fixed versions with 'package==version' are allowed."
         return True, "Requirements file is valid."
     except Exception as e:
         return False, f"Error reading requirements file: {e}"
 
-def validate_submission(submitted_info):
-    """Ensure required inputs exist and meet basic quality checks."""
+@st.cache_data(ttl=60, show_spinner=False)
+def collect_submission_errors(project_name, project_version, upload_signature):
+    """Validation only depends on these hashable inputs, so unchanged submissions reuse the result."""
     errors = []
 
-    project_name = submitted_info.get("project_name", "").strip()
     if not project_name:
         errors.append("Project name is required.")
     else:
@@ -121,28 +158,35 @@ def validate_submission(submitted_info):
             errors.append("Project name must be at least 3 characters long.")
         elif len(project_name) > 50:
             errors.append("Project name must be at most 50 characters long.")
-        elif not re.match(r"^[A-Za-z0-9 _.-]+$", project_name):
+        elif not PROJECT_NAME_PATTERN.match(project_name):
             errors.append("Project name contains invalid characters. Only letters, numbers, spaces, underscores, hyphens, and periods are allowed.")
-        elif project_name.lower() in (name.lower() for name in st.session_state["stdlib_modules"]):
+        elif project_name.lower() in get_stdlib_modules_lower():
             errors.append(f"Project name '{project_name}' cannot be the same as an existing Python standard library module. This would break some of the LabConstrictor functionalities. Please choose a different name.")
 
-    project_version = submitted_info.get("project_version", "").strip()
     if not project_version:
         errors.append("Project version is required.")
     else:
-        semver_pattern = r"^\d+\.\d+\.\d+(-[0-9A-Za-z-.]+)?(\+[0-9A-Za-z-.]+)?$"
-        if not re.match(semver_pattern, project_version):
+        if not SEMVER_PATTERN.match(project_version):
             errors.append("Project version must follow semantic versioning (e.g., 1.0.0).")
 
-    if uploaded_icon := submitted_info.get("icon_uploaded"):
-        if uploaded_icon.size > MAX_FILE_SIZE_MB * 1024 * 1024:
-            errors.append(f"Icon file '{uploaded_icon.name}' exceeds {MAX_FILE_SIZE_MB} MB limit.")
-    if uploaded_welcome := submitted_info.get("welcome_uploaded"):
-        if uploaded_welcome.size > MAX_FILE_SIZE_MB * 1024 * 1024:
-            errors.append(f"Welcome file '{uploaded_welcome.name}' exceeds {MAX_FILE_SIZE_MB} MB limit.")
-    if uploaded_headers := submitted_info.get("headers_uploaded"):
-        if uploaded_headers.size > MAX_FILE_SIZE_MB * 1024 * 1024:
-            errors.append(f"Headers file '{uploaded_headers.name}' exceeds {MAX_FILE_SIZE_MB} MB limit.")
+    for label, file_name, file_size in upload_signature:
+        if file_size > MAX_FILE_SIZE_BYTES:
+            errors.append(f"{label} file '{file_name}' exceeds {MAX_FILE_SIZE_MB} MB limit.")
+
+    return tuple(errors)
+
+def validate_submission(submitted_info):
+    """Ensure required inputs exist and meet basic quality checks."""
+    upload_signature = tuple(
+        (label, upload.name, upload.size)
+        for label, key in UPLOAD_FIELDS
+        if (upload := submitted_info.get(key))
+    )
+    errors = list(collect_submission_errors(
+        submitted_info.get("project_name", "").strip(),
+        submitted_info.get("project_version", "").strip(),
+        upload_signature,
+    ))
 
     if not errors:
         st.session_state["ready_for_pr"] = True
@@ -157,138 +201,226 @@ def reset_tool_versions():
         if key in st.session_state:
             del st.session_state[key]
 
-def get_authenticated_username(token):
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Accept": "application/vnd.github+json"
-    }
-    response = requests.get("https://api.github.com/user", headers=headers)
-    if response.status_code == 200:
-        return response.json().get("login", "user")
-    else:
-        raise RuntimeError(f"❌ Could not retrieve GitHub username: {response.status_code} — {response.text}")
+@st.cache_resource
+def get_github_session(retry_posts=False):
+    """Shared GitHub API session, so consecutive calls reuse one keep-alive TLS connection."""
+    # requests is only needed once a pull request is created, so keep it off the form-only path
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    session = requests.Session()
+    session.headers.update({"Accept": "application/vnd.github+json"})
+    # Every GraphQL call is a POST, which urllib3 only retries when allowed explicitly. Only the read-only
+    # queries opt in, so a retried createPullRequest can never open the pull request twice
+    retries = 0
+    if retry_posts:
+        retries = Retry(
+            total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504],
+            allowed_methods=frozenset({"POST"}), raise_on_status=False,
+        )
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=retries))
+    return session
+
+GITHUB_GRAPHQL_URL = "https://api.github.com/graphql"
+
+GITHUB_CONTEXT_QUERY = """
+query($owner: String!, $name: String!) {
+  viewer { login }
+  repository(owner: $owner, name: $name) { id }
+}
+"""
+
+CREATE_PULL_REQUEST_MUTATION = """
+mutation($repositoryId: ID!, $head: String!, $base: String!, $title: String!, $body: String!) {
+  createPullRequest(input: {repositoryId: $repositoryId, headRefName: $head, baseRefName: $base,
+                            title: $title, body: $body, maintainerCanModify: true}) {
+    pullRequest { url }
+  }
+}
+"""
+
+def run_github_graphql(query, variables, token, retry=False):
+    headers = {"Authorization": f"Bearer {token}"}
+    response = get_github_session(retry_posts=retry).post(
+        GITHUB_GRAPHQL_URL, headers=headers, json={"query": query, "variables": variables}
+    )
+    if response.status_code != 200:
+        raise RuntimeError(f"❌ GitHub GraphQL request failed: {response.status_code} — {response.text}")
+    payload = response.json()
+    if payload.get("errors"):
+        messages = "; ".join(error.get("message", str(error)) for error in payload["errors"])
+        raise RuntimeError(f"❌ GitHub GraphQL error: {messages}")
+    return payload["data"]
+
+def get_github_context(github_repo_url, token):
+    """Return the authenticated username and the repository node ID in a single GraphQL query."""
+    github_owner, github_repo_name = parse_github_repo(github_repo_url)
+
+    # The token and repository do not change within a session, so only ask GitHub once
+    cache_key = "gh_context_" + hashlib.sha256(
+        f"{token}|{github_owner}/{github_repo_name}".encode("utf-8")
+    ).hexdigest()[:16]
+    if cache_key in st.session_state:
+        return st.session_state[cache_key]
+
+    data = run_github_graphql(
+        GITHUB_CONTEXT_QUERY, {"owner": github_owner, "name": github_repo_name}, token, retry=True
+    )
+    context = (data["viewer"]["login"], data["repository"]["id"])
+    st.session_state[cache_key] = context
+    return context
     
-def has_changes_to_commit(path, cwd):
+def write_progress(message, transient=False):
+    """Default progress logger: write each message to the page, skipping transient updates."""
+    if not transient:
+        st.write(message)
+
+def drop_ignored_paths(paths, cwd):
+    """Return the paths, relative to cwd, without those matching a .gitignore rule, which 'git add' would refuse."""
+    # Relative pathspecs can't trip git's "outside repository" check on symlinked or short-named temp folders
+    relative_paths = [Path(path).relative_to(cwd).as_posix() for path in paths]
+    args = ["check-ignore", "-z", "--stdin"]
+    result = subprocess.run(
+        ["git"] + args, cwd=cwd, input="\0".join(relative_paths), capture_output=True, text=True
+    )
+    # Exit code 1 means that none of the paths is ignored
+    if result.returncode not in (0, 1):
+        raise RuntimeError(f"❌ Git error running 'git {' '.join(args)}':\n{result.stderr.strip()}")
+    ignored_paths = set(result.stdout.split("\0"))
+    return [path for path in relative_paths if path not in ignored_paths]
+
+def has_changes_to_commit(paths, cwd, log=write_progress):
     try:
-        status = run_git_command(["status", "--porcelain", str(path)], cwd=cwd)
-        return bool(status.strip())
+        # Expects the changes to be staged already; 'git diff --quiet' answers through its exit code
+        args = ["diff", "--cached", "--quiet", "--"] + [str(path) for path in paths]
+        result = subprocess.run(["git"] + args, cwd=cwd, capture_output=True, text=True)
+        if result.returncode not in (0, 1):
+            raise RuntimeError(f"❌ Git error running 'git {' '.join(args)}':\n{result.stderr.strip()}")
+        return result.returncode == 1
     except Exception as e:
-        st.write(f"⚠️ Could not check changes: {e}")
+        log(f"⚠️ Could not check changes: {e}")
         return False
 
-def run_git_command(args, cwd=None, github_token=None):
+@lru_cache(maxsize=4)
+def basic_auth_header(github_token):
+    """HTTP Authorization header for git, encoded once per token."""
+    basic_token = base64.b64encode(
+        f"x-access-token:{github_token}".encode("utf-8")
+    ).decode("ascii")
+    return f"Authorization: Basic {basic_token}"
+
+def run_git_command(args, cwd=None, github_token=None, on_wait=None):
     git_cmd = ["git"]
-    env = None
     if github_token:
         sanitized_token = github_token.strip()
         if sanitized_token:
-            basic_token = base64.b64encode(
-                f"x-access-token:{sanitized_token}".encode("utf-8")
-            ).decode("ascii")
-            auth_value = f"Basic {basic_token}"
-            git_cmd.extend(["-c", f"http.extraHeader=Authorization: {auth_value}"])
-            env = os.environ.copy()
-            env["GIT_HTTP_AUTHORIZATION"] = auth_value
-    result = subprocess.run(
-        git_cmd + args, cwd=cwd, capture_output=True, text=True, env=env
-    )
-    if result.returncode != 0:
-        raise RuntimeError(f"❌ Git error running 'git {' '.join(args)}':\n{result.stderr.strip()}")
-    return result.stdout.strip()
+            # git only reads the credentials from http.extraHeader, so the inherited environment is used as is
+            git_cmd.extend(["-c", f"http.extraHeader={basic_auth_header(sanitized_token)}"])
+    if on_wait is None:
+        result = subprocess.run(
+            git_cmd + args, cwd=cwd, capture_output=True, text=True
+        )
+        returncode, stdout, stderr = result.returncode, result.stdout, result.stderr
+    else:
+        # Poll long-running commands (e.g. push) so the caller can report progress while git works
+        start_time = time.monotonic()
+        with subprocess.Popen(
+            git_cmd + args, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+        ) as process:
+            while True:
+                try:
+                    stdout, stderr = process.communicate(timeout=0.2)
+                    break
+                except subprocess.TimeoutExpired:
+                    on_wait(time.monotonic() - start_time)
+        returncode = process.returncode
+    if returncode != 0:
+        raise RuntimeError(f"❌ Git error running 'git {' '.join(args)}':\n{stderr.strip()}")
+    return stdout.strip()
 
 def push_config_changes_to_new_branch(
-    folder, branch_prefix, commit_message, github_token, repo_path
+    paths, branch_prefix, commit_message, github_token, repo_path, username, log=write_progress
 ):
     try:
-
-        username = get_authenticated_username(github_token)
         timestamp = datetime.now().strftime("%Y%m%d%H%M")
         new_branch = f"{branch_prefix}/{username}-{timestamp}"
 
-        run_git_command(["config", "user.email", f"{username}@users.noreply.github.com"], cwd=repo_path)
-        run_git_command(["config", "user.name", username], cwd=repo_path)
-
-        run_git_command(["checkout", "main"], cwd=repo_path)
-        run_git_command(["pull", "origin", "main"], cwd=repo_path, github_token=github_token)
-
-        if not has_changes_to_commit(folder, cwd=repo_path):
-            st.write(f"ℹ️ No changes detected in `{folder}`. Nothing to push.")
+        # Only the paths the submission wrote are staged, so git doesn't walk the whole working tree;
+        # ignored ones are left out, as 'git add' on the repository root used to skip them
+        paths = drop_ignored_paths(paths, cwd=repo_path)
+        if paths:
+            run_git_command(["add", "--"] + paths, cwd=repo_path)
+        if not paths or not has_changes_to_commit(paths, cwd=repo_path, log=log):
+            log(f"ℹ️ No changes detected in the submitted files. Nothing to push.")
             return None
         else:
-            st.write(f"✅ Changes detected!")
+            log(f"✅ Changes detected!")
 
-        run_git_command(["checkout", "-b", new_branch], cwd=repo_path)
-        run_git_command(["add", folder], cwd=repo_path)
-        run_git_command(["commit", "-m", commit_message], cwd=repo_path)
+        # Pass the committer identity inline instead of spawning two extra 'git config' processes
         run_git_command(
-            ["push", "--set-upstream", "origin", new_branch],
+            ["-c", f"user.name={username}",
+             "-c", f"user.email={username}@users.noreply.github.com",
+             "commit", "-m", commit_message],
+            cwd=repo_path,
+        )
+        # Push the commit straight to the new remote branch, the local clone is reset to main on the next sync anyway
+        run_git_command(
+            ["push", "origin", f"HEAD:refs/heads/{new_branch}"],
             cwd=repo_path,
             github_token=github_token,
+            on_wait=lambda elapsed: log(f"⬆️ Pushing to `{new_branch}`... {elapsed:.1f}s", transient=True),
         )
 
-        st.write(f"✅ Successfully pushed to branch `{new_branch}`.")
+        log(f"✅ Successfully pushed to branch `{new_branch}`.")
         return new_branch
 
     except Exception as e:
-        st.write(f"❌ Failed to push changes: {e}")
+        log(f"❌ Failed to push changes: {e}")
         return None
     
-def create_pull_request(from_branch, title, body, github_repo_url, github_token):
+def create_pull_request(from_branch, title, body, repository_id, github_token, log=write_progress):
     try:
-        repo_url = github_repo_url.strip().rstrip('/')
-        github_owner, github_repo_name = repo_url.split('/')[-2:]
-        api_url = f"https://api.github.com/repos/{github_owner}/{github_repo_name}/pulls"
-
-        headers = {
-            "Accept": "application/vnd.github+json",
-            "Authorization": f"Bearer {github_token.strip()}"
-        }
-
-        payload = {
-            "title": title,
+        variables = {
+            "repositoryId": repository_id,
             "head": from_branch,
             "base": "main",
+            "title": title,
             "body": body,
-            "maintainer_can_modify": True
         }
-
-        response = requests.post(api_url, headers=headers, json=payload)
-
-        if response.status_code == 201:
-            pr_url = response.json()["html_url"]
-            st.write(f"✅ Pull request correctly created!")
-            return response.json()
-
-        elif response.status_code == 422 and "already exists" in response.text:
-            st.write(f"ℹ️ Pull request already exists for branch `{from_branch}`. It has been automatically updated.")
-            return None
-
-        else:
-            st.write(f"❌ Failed to create pull request: {response.status_code} — {response.text}")
-            return None
+        data = run_github_graphql(CREATE_PULL_REQUEST_MUTATION, variables, github_token.strip())
+        log(f"✅ Pull request correctly created!")
+        return data["createPullRequest"]["pullRequest"]
 
     except Exception as e:
-        st.write(f"❌ Error creating PR: {e}")
+        if "already exists" in str(e):
+            log(f"ℹ️ Pull request already exists for branch `{from_branch}`. It has been automatically updated.")
+        else:
+            log(f"❌ Error creating PR: {e}")
         return None
     
-def push_and_create_pr(folder, branch_prefix, 
+def push_and_create_pr(paths, branch_prefix, 
                        commit_message, pr_title, pr_body, 
-                       github_repo_url, github_token, 
-                       repo_path):
+                       username, repository_id, github_token, 
+                       repo_path, log=write_progress):
     branch = push_config_changes_to_new_branch(
-        folder=folder,
+        paths=paths,
         branch_prefix=branch_prefix,
         commit_message=commit_message,
         github_token=github_token,
-        repo_path=repo_path
+        repo_path=repo_path,
+        username=username,
+        log=log
     )
     if branch:
+        log("🔀 Creating pull request...", transient=True)
         return create_pull_request(
             from_branch=branch,
             title=pr_title,
             body=pr_body,
-            github_repo_url=github_repo_url,
-            github_token=github_token
+            repository_id=repository_id,
+            github_token=github_token,
+            log=log
         )
     return None
 
@@ -299,13 +431,44 @@ def handle_remove_error(func, path, exc_info):
         func(path)
     else:
         raise exc_info[1]
+
+def sync_repository(repo_url, repo_path, github_token):
+    """Clone the repository, or reset an existing clone to a clean copy of origin/main."""
+    if (repo_path / ".git").exists():
+        run_git_command(["fetch", "--depth=1", "--no-tags", "origin", "main"], cwd=repo_path, github_token=github_token)
+        run_git_command(["checkout", "--force", "-B", "main", "FETCH_HEAD"], cwd=repo_path)
+        run_git_command(["clean", "-fdx"], cwd=repo_path)
+        return
+
+    # Leftovers without a .git folder (e.g. an interrupted clone) would make 'git clone' fail
+    if repo_path.exists():
+        shutil.rmtree(repo_path, onerror=handle_remove_error)
+    run_git_command(
+        ["clone", "--depth=1", "--single-branch", "--branch", "main", "--no-tags", repo_url, str(repo_path)],
+        github_token=github_token,
+    )
         
-def replace_in_file(file_path, old, new):
-    with open(file_path, 'r', encoding='utf-8') as file:
-        content = file.read()
-    content = content.replace(old, str(new).strip())
-    with open(file_path, 'w', encoding='utf-8') as file:
-        file.write(content)
+def replace_in_text(content, replacements):
+    """Apply every {placeholder: replacement} pair to the text in a single regex sweep."""
+    # Longest placeholders first, so e.g. UNDERSCORED_PROJECT_NAME wins over PROJECT_NAME
+    pattern = re.compile("|".join(re.escape(old) for old in sorted(replacements, key=len, reverse=True)))
+    return pattern.sub(lambda match: str(replacements[match.group(0)]).strip(), content)
+
+def replace_in_file(file_path, replacements):
+    """Apply every {placeholder: replacement} pair to a file with a single read and write."""
+    content = Path(file_path).read_text(encoding="utf-8")
+    updated_content = replace_in_text(content, replacements)
+    # Leave files without any placeholder untouched, so their mtime doesn't change
+    if updated_content == content:
+        return
+    Path(file_path).write_text(updated_content, encoding="utf-8")
+
+
+def save_uploaded_file(uploaded_file, destination):
+    """Copy an uploaded file to disk in chunks instead of materialising it in memory."""
+    uploaded_file.seek(0)
+    with open(destination, "wb") as f:
+        shutil.copyfileobj(uploaded_file, f, length=1024 * 1024)
 
 
 def synchronize_welcome_template(repo_path):
@@ -333,43 +496,84 @@ def synchronize_welcome_template(repo_path):
     return True
 
 
-def capture_yaml_key_lines(yaml_text: str, key: str):
-    """Return all lines whose trimmed content starts with '<key>:'."""
-    prefix = f"{key}:"
-    captured = []
-    for line in yaml_text.splitlines():
-        stripped = line.lstrip()
-        if stripped.startswith(prefix):
-            indent = line[: len(line) - len(stripped)]
-            captured.append(f"{indent}{stripped}")
-    return captured
+def yaml_key_line_pattern(keys):
+    """Match a whole line whose trimmed content starts with one of the '<key>:', capturing the key and its line break."""
+    return re.compile(rf"^[ \t]*({'|'.join(re.escape(key) for key in keys)}):[^\n]*(\n?)", re.MULTILINE)
 
 
-def restore_yaml_duplicate_keys(serialized_text: str, key: str, preserved_lines):
-    """Replace the serialized '<key>:' line with the preserved lines (i.e., duplicates)."""
-    if not preserved_lines:
-        return serialized_text
-    key_prefix = f"{key}:"
-    output_lines = []
-    inserted = False
-    for line in serialized_text.splitlines():
-        stripped = line.lstrip()
-        if stripped.startswith(key_prefix):
-            if not inserted:
-                output_lines.extend(preserved_lines)
-                inserted = True
-            continue
-        output_lines.append(line)
+def capture_yaml_key_lines(yaml_text: str, keys):
+    """Return, per key, all lines whose trimmed content starts with '<key>:'."""
+    captured_lines = {key: [] for key in keys}
+    for match in yaml_key_line_pattern(keys).finditer(yaml_text):
+        captured_lines[match.group(1)].append(match.group(0).rstrip("\n"))
+    return captured_lines
 
-    if not inserted:
-        output_lines.extend(preserved_lines)
 
-    if serialized_text.endswith("\n"):
-        return "\n".join(output_lines) + "\n"
-    return "\n".join(output_lines)
-
-
-def create_icns(img, output_path):
+def restore_yaml_duplicate_keys(serialized_text: str, preserved_lines):
+    """Replace each serialized '<key>:' line with its preserved lines (i.e., duplicates), in a single pass."""
+    replacements = {key: "\n".join(lines) for key, lines in preserved_lines.items() if lines}
+    if not replacements:
+        return serialized_text
+    inserted = set()
+
+    def substitute(match):
+        key = match.group(1)
+        if key in inserted:
+            return ""
+        inserted.add(key)
+        return replacements[key] + match.group(2)
+
+    restored_text = yaml_key_line_pattern(replacements).sub(substitute, serialized_text)
+    # Dropping a final duplicate without a line break leaves the previous line's break behind
+    if inserted and not serialized_text.endswith("\n") and restored_text.endswith("\n"):
+        restored_text = restored_text[:-1]
+
+    # Keys missing from the serialized text are appended at the end
+    for key, replacement in replacements.items():
+        if key in inserted:
+            continue
+        separator = "\n" if restored_text and not restored_text.endswith("\n") else ""
+        trailing = "\n" if restored_text.endswith("\n") else ""
+        restored_text = restored_text + separator + replacement + trailing
+    return restored_text
+
+
+ICON_SIZES: Final[tuple[int, ...]] = (16, 32, 64, 128, 256, 512, 1024)
+
+def resize_icon(img):
+    """Resample the icon once per size so the ICO and ICNS files can share the thumbnails."""
+    from PIL import Image
+
+    img.load()
+    # Use different interpolation methods depending on size:
+    # NEAREST for very small sizes for crispness, LANCZOS for better quality at larger ones
+    def resize(size):
+        return img.resize((size, size), Image.NEAREST if size <= 32 else Image.LANCZOS)
+    # PIL releases the GIL while resampling, so the sizes can be resized in parallel
+    with ThreadPoolExecutor(max_workers=min(len(ICON_SIZES), os.cpu_count() or 1)) as executor:
+        return dict(zip(ICON_SIZES, executor.map(resize, ICON_SIZES)))
+
+def ico_frames(img, thumbs):
+    """Frames for the ICO file: LANCZOS resamples of the upload, reusing the shared thumbnails from 64px up."""
+    from PIL import Image
+
+    if img.width != img.height:
+        # The shared thumbnails are squared, so let PIL build the aspect-preserving frames itself
+        return []
+    # The NEAREST 16/32px thumbnails are only crisp enough for the ICNS, the ICO gets LANCZOS ones
+    return [img.resize((size, size), Image.LANCZOS) for size in (16, 32)] + [thumbs[size] for size in (64, 128, 256)]
+
+def encode_icns_block(icon_type, img):
+    """Encode one icon size as a PNG block of the ICNS container."""
+    # Save the image to PNG format in memory
+    png_data_io = BytesIO()
+    img.save(png_data_io, format='PNG', optimize=False, compress_level=1)
+    png_data = png_data_io.getvalue()
+
+    # Build the icon block
+    return icon_type.encode('utf-8') + struct.pack('>I', len(png_data) + 8) + png_data
+
+def create_icns(thumbs, output_path):
     # Function taken from: https://github.com/jojomondag/PNG_to_ico_to_icns_converter/blob/main/PNG_to_ico_to_icns_converter.py
     # Define the icon types and sizes
     icon_sizes = {
@@ -382,41 +586,33 @@ def create_icns(img, output_path):
         'ic10': (1024, 1024),   # 1024x1024
     }
 
-    icns_data = b''
-    for icon_type, size in icon_sizes.items():
-        # Use different interpolation methods depending on size
-        if size[0] <= 32:  # For very small sizes, use NEAREST for crispness
-            resized_img = img.resize(size, Image.NEAREST)
-        else:  # For larger sizes, use LANCZOS for better quality
-            resized_img = img.resize(size, Image.LANCZOS)
-
-        # Save the image to PNG format in memory
-        png_data_io = BytesIO()
-        resized_img.save(png_data_io, format='PNG')
-        png_data = png_data_io.getvalue()
-
-        # Build the icon block
-        icon_block = icon_type.encode('utf-8') + struct.pack('>I', len(png_data) + 8) + png_data
-        icns_data += icon_block
+    # Encode the blocks in parallel, reusing the thumbnails resampled by resize_icon;
+    # executor.map keeps the blocks in the icon_sizes order
+    with ThreadPoolExecutor(max_workers=min(len(icon_sizes), os.cpu_count() or 1)) as executor:
+        icns_data = b''.join(executor.map(encode_icns_block, icon_sizes.keys(),
+                                          (thumbs[size[0]] for size in icon_sizes.values())))
 
     # ICNS header
     icns_header = b'icns' + struct.pack('>I', len(icns_data) + 8)
-    with open(output_path, 'wb') as f:
-        f.write(icns_header)
-        f.write(icns_data)
+    Path(output_path).write_bytes(icns_header + icns_data)
 
 def initialize_project(repo_path, project_name, version, hide_code,
                        welcome_image_path, header_image_path, icon_image_path,
                        ico_image_path, icns_image_path, 
                        github_owner, github_repo_name):
 
+    import yaml
+
     # Copy and replace template files into their final locations
     template_to_location = {
         ".tools/templates/hide_code_cells.py": "app/python_scripts/hide_code_cells.py"
     }
 
+    # Every file written here is collected, so only those paths have to be staged
+    modified_paths = []
     for template_path, final_path in template_to_location.items():
         shutil.copyfile(repo_path / template_path, repo_path / final_path)
+        modified_paths.append(repo_path / final_path)
 
     # Define the conversion dictionary
     proyectname_lower = project_name.lower()
@@ -471,47 +667,53 @@ def initialize_project(repo_path, project_name, version, hide_code,
         },
         "HIDE_CODE_DISABLED": {
             "app/python_scripts/hide_code_cells.py": hide_code,
-        }
+        },
+        # Set the icons of the notebook launcher if they were provided
+        "ICON_IMAGE_PATH": {
+            "app/menuinst/notebook_launcher.json": f"BASE_PATH_KEYWORD/{project_name}/{icon_image_path.name}" if icon_image_path else "",
+        },
+        "ICON_ICO_IMAGE_PATH": {
+            "app/menuinst/notebook_launcher.json": f"BASE_PATH_KEYWORD/{project_name}/{ico_image_path.name}" if ico_image_path else "",
+        },
+        "ICON_ICNS_IMAGE_PATH": {
+            "app/menuinst/notebook_launcher.json": f"BASE_PATH_KEYWORD/{project_name}/{icns_image_path.name}" if icns_image_path else "",
+        },
     }
 
-    # Replace placeholders in files
+    # Group the replacements per file, so that every file is read and written only once
+    replacements_per_file = {}
     for placeholder, files in conversion_dict.items():
         for file_path, replacement in files.items():
-            replace_in_file(repo_path / file_path, placeholder, replacement)
+            replacements_per_file.setdefault(file_path, {})[placeholder] = replacement
+
+    # construct.yaml is edited further below, so its replacements are applied in memory there
+    construct_replacements = replacements_per_file.pop("construct.yaml")
+
+    # Replace placeholders in files; each file is independent and mostly I/O, so they are rewritten in parallel
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        rewrites = [
+            executor.submit(replace_in_file, repo_path / file_path, replacements)
+            for file_path, replacements in replacements_per_file.items()
+        ]
+        for rewrite in rewrites:
+            rewrite.result()
+    modified_paths += [repo_path / file_path for file_path in replacements_per_file]
 
     package_dir = repo_path / "src" / python_project_name
     package_dir.mkdir(parents=True, exist_ok=True)
     init_file = package_dir / "__init__.py"
     if not init_file.exists():
         init_file.write_text("", encoding="utf-8")
-
-    # Update the notebook launcher JSON file to set the icons if needed
-    notebook_launcher_path = repo_path / "app" / "menuinst" / "notebook_launcher.json"
-    if notebook_launcher_path.exists():
-        with open(notebook_launcher_path, "r", encoding="utf-8") as f:
-            launcher_data = f.read()
-        if icon_image_path:
-            launcher_data = launcher_data.replace("ICON_IMAGE_PATH", f"BASE_PATH_KEYWORD/{project_name}/{icon_image_path.name}")
-        else:
-            launcher_data = launcher_data.replace("ICON_IMAGE_PATH", f"")
-        if ico_image_path:
-            launcher_data = launcher_data.replace("ICON_ICO_IMAGE_PATH", f"BASE_PATH_KEYWORD/{project_name}/{ico_image_path.name}")
-        else:
-            launcher_data = launcher_data.replace("ICON_ICO_IMAGE_PATH", f"")
-        if icns_image_path:
-            launcher_data = launcher_data.replace("ICON_ICNS_IMAGE_PATH", f"BASE_PATH_KEYWORD/{project_name}/{icns_image_path.name}")
-        else:
-            launcher_data = launcher_data.replace("ICON_ICNS_IMAGE_PATH", f"")
-        with open(notebook_launcher_path, "w", encoding="utf-8") as f:
-            f.write(launcher_data)
+    modified_paths.append(init_file)
 
     # Update the construct.yaml extra_files to include the images if they were provided
     # Read the construct.yaml to check if images need to be set
     construct_path = repo_path / "construct.yaml"
-    construct_raw_text = construct_path.read_text(encoding="utf-8")
-    post_install_lines = capture_yaml_key_lines(construct_raw_text, "post_install")
-    pre_uninstall_lines = capture_yaml_key_lines(construct_raw_text, "pre_uninstall")
-    construct_data = yaml.safe_load(construct_raw_text)
+    construct_raw_text = replace_in_text(construct_path.read_text(encoding="utf-8"), construct_replacements)
+    # PyYAML keeps only the last of duplicate keys, so their original lines are restored after dumping
+    duplicate_key_lines = capture_yaml_key_lines(construct_raw_text, ("post_install", "pre_uninstall"))
+    yaml_loader, yaml_dumper = yaml_safe_classes()
+    construct_data = yaml.load(construct_raw_text, Loader=yaml_loader)
     if construct_data is None:
         construct_data = {}
     extra_files = construct_data.get("extra_files")
@@ -531,6 +733,7 @@ def initialize_project(repo_path, project_name, version, hide_code,
     # Normalize existing entries into a dict for quick lookup
     existing_sources = set()
     existing_dests = set()
+    # Each entry is kept next to its sort key (dicts by their single key, then strings), computed as it is normalised
     normalized_items = []
 
     for item in extra_files:
@@ -539,10 +742,10 @@ def initialize_project(repo_path, project_name, version, hide_code,
             for src, dst in item.items():
                 existing_sources.add(str(src))
                 existing_dests.add(str(dst))
-                normalized_items.append({str(src): str(dst)})
+                normalized_items.append(((0, str(src)), {str(src): str(dst)}))
         else:
             # If strings are present, keep them
-            normalized_items.append(item)
+            normalized_items.append(((1, str(item)), item))
 
     # Check if the images paths are provided and not already in the list¨
     image_mappings = [ icon_image_path, ico_image_path, icns_image_path ]
@@ -551,61 +754,100 @@ def initialize_project(repo_path, project_name, version, hide_code,
         if src_path:
             dest_path = f"{project_name}/{src_path.name}"
             if src_path and str(src_path) not in existing_sources and dest_path not in existing_dests:
-                normalized_items.append({str(src_path): dest_path})
+                normalized_items.append(((0, str(src_path)), {str(src_path): dest_path}))
                 
-    # Optionally sort entries (dicts by their single key) for determinism
-    def sort_key(item):
-        if isinstance(item, dict):
-            # single-key dict
-            k = next(iter(item.keys()))
-            return (0, k)
-        return (1, str(item))
-
-    normalized_items.sort(key=sort_key)
-    construct_data["extra_files"] = normalized_items
+    # Sort entries for determinism, only by the precomputed keys since dicts are not orderable
+    normalized_items.sort(key=lambda keyed_item: keyed_item[0])
+    construct_data["extra_files"] = [item for _, item in normalized_items]
 
     # Write back the updated construct.yaml
-    construct_serialized = yaml.dump(construct_data, sort_keys=False)
-    construct_serialized = restore_yaml_duplicate_keys(
-        construct_serialized, "post_install", post_install_lines
-    )
-    construct_serialized = restore_yaml_duplicate_keys(
-        construct_serialized, "pre_uninstall", pre_uninstall_lines
-    )
+    construct_serialized = yaml.dump(construct_data, Dumper=yaml_dumper, sort_keys=False)
+    construct_serialized = restore_yaml_duplicate_keys(construct_serialized, duplicate_key_lines)
     construct_path.write_text(construct_serialized, encoding="utf-8")
+    modified_paths.append(construct_path)
+    return modified_paths
+
+@contextmanager
+def repository_lock(repo_path):
+    """Hold an exclusive lock on a cached clone from its sync until the push, across sessions."""
+    REPO_CACHE_DIR.mkdir(mode=0o700, parents=True, exist_ok=True)
+    # The clones may be private, so the cache must not stay readable by other users of the temp dir
+    REPO_CACHE_DIR.chmod(0o700)
+    # The lock file sits next to the clone, since 'git clone' needs an empty target folder
+    with open(repo_path.with_name(f"{repo_path.name}.lock"), "a+b") as lock_file:
+        if os.name == "nt":
+            import msvcrt
+            lock_file.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    # LK_LOCK gives up after about 10 seconds, keep waiting for the other submission
+                    continue
+        else:
+            import fcntl
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if os.name == "nt":
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def enqueue_pull_request(repo_url, personal_access_token, input_dict, log=write_progress):
+    """Submit the pull request while holding the lock of the repository's cached clone."""
+    repo_path = REPO_CACHE_DIR / hashlib.sha256(repo_url.encode()).hexdigest()[:12]
+    with repository_lock(repo_path):
+        return submit_pull_request(repo_url, personal_access_token, input_dict, repo_path, log=log)
 
-def enqueue_pull_request(repo_url, personal_access_token, input_dict):
+def submit_pull_request(repo_url, personal_access_token, input_dict, repo_path, log=write_progress):
     
-    github_owner, github_repo_name = repo_url.rstrip('/').split('/')[-2:]
+    github_owner, github_repo_name = parse_github_repo(repo_url)
 
-    st.write(f"### Creating pull request for {github_repo_name}...")
+    log(f"### Creating pull request for {github_repo_name}...")
 
     # Download the GitHub repo, create a branch, add files, open a PR, etc.
-    if "repo_path" in st.session_state and (st.session_state["repo_path"] / ".git").exists():
-        st.write(f"✅ Git repo already cloned at {st.session_state['repo_path']}")
+    # The clone is kept between submissions and sessions and only refreshed, so repeat submissions skip the download
+    repo_already_cloned = (repo_path / ".git").exists()
+    if repo_already_cloned:
+        log("🔄 Updating Git repo...", transient=True)
+        log(f"🔄 Updating Git repo at {repo_path}...")
     else:
-        st.session_state["repo_path"] = Path.cwd() / github_repo_name 
-        
-        if (st.session_state["repo_path"] / ".git").exists():
-            st.write(f"🧹 Removing existing folder at {st.session_state['repo_path']}...")
-            shutil.rmtree(st.session_state["repo_path"], onerror=handle_remove_error)
+        log("🌀 Cloning Git repo...", transient=True)
+        log(f"🌀 Cloning Git repo to {repo_path}...")
+
+    # Syncing the repo and the GitHub account/repository lookup are independent network round-trips,
+    # so git runs in a worker thread while the lookup runs here (it needs st.session_state)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        sync_future = executor.submit(
+            sync_repository, repo_url, repo_path, personal_access_token
+        )
 
-        st.write(f"🌀 Cloning Git repo to {st.session_state['repo_path']}...")
+        try:
+            username, repository_id = get_github_context(repo_url, personal_access_token)
+        except Exception as context_error:
+            raise RuntimeError(
+                f"❌ Could not retrieve GitHub account and repository details: {context_error}"
+            ) from context_error
 
         try:
-            run_git_command(
-                ["clone", repo_url, str(st.session_state["repo_path"])],
-                github_token=personal_access_token,
-            )
-        except RuntimeError as clone_error:
-            raise RuntimeError(f"❌ Git clone failed: {clone_error}") from clone_error
-        
-        st.write(f"✅ Git repo cloned at {st.session_state['repo_path']}")
+            sync_future.result()
+        except RuntimeError as sync_error:
+            action = "update" if repo_already_cloned else "clone"
+            raise RuntimeError(f"❌ Git {action} failed: {sync_error}") from sync_error
+
+    if repo_already_cloned:
+        log(f"✅ Git repo updated at {repo_path}")
+    else:
+        log(f"✅ Git repo cloned at {repo_path}")
 
-    st.write("🛠 Initialising project files...")
+    log("🛠 Initialising project files...")
 
     if input_dict["submission_mode"] == "initialize":
-        logo_folder_path = st.session_state["repo_path"] / "app" / "logo"
+        logo_folder_path = repo_path / "app" / "logo"
         logo_folder_path.mkdir(parents=True, exist_ok=True)
 
         icon_path, ico_path, icns_path, welcome_path, headers_path = "", "", "", "", ""
@@ -615,30 +857,36 @@ def enqueue_pull_request(repo_url, personal_access_token, input_dict):
             icon_path = Path("app") / "logo" / input_dict["icon_uploaded"].name
             ico_path = Path("app") / "logo" / input_dict["icon_uploaded"].name.replace(".png", ".ico")
             icns_path = Path("app") / "logo" / input_dict["icon_uploaded"].name.replace(".png", ".icns")
-            with open(st.session_state["repo_path"] / icon_path, "wb") as f:
-                f.write(input_dict["icon_uploaded"].getbuffer())
+            save_uploaded_file(input_dict["icon_uploaded"], repo_path / icon_path)
 
-            # Load the uploaded image
+            # Load the uploaded image, Pillow is only imported when an icon is uploaded
+            from PIL import Image
+            input_dict["icon_uploaded"].seek(0)
             ico_logo = Image.open(input_dict["icon_uploaded"])
-            # Save as ICO
-            ico_logo.save(st.session_state["repo_path"] / ico_path, 
-                    format='ICO', sizes=[(16,16), (32,32), (64,64), (128,128), (256,256)])
+            thumbs = resize_icon(ico_logo)
+            # Save as ICO, PIL skips the sizes larger than the upload itself and picks the matching frames
+            ico_logo.save(repo_path / ico_path,
+                    format='ICO', sizes=[(16,16), (32,32), (64,64), (128,128), (256,256)],
+                    append_images=ico_frames(ico_logo, thumbs))
             # Save as ICNS
-            create_icns(ico_logo, st.session_state["repo_path"] / icns_path)
+            create_icns(thumbs, repo_path / icns_path)
 
         # First move the uploaded files to the repo path under the app/logo
         if input_dict["welcome_uploaded"]:
             welcome_path = Path("app") / "logo" / input_dict["welcome_uploaded"].name
-            with open(st.session_state["repo_path"] / welcome_path, "wb") as f:
-                f.write(input_dict["welcome_uploaded"].getbuffer())
+            save_uploaded_file(input_dict["welcome_uploaded"], repo_path / welcome_path)
         if input_dict["headers_uploaded"]:
             headers_path = Path("app") / "logo" / input_dict["headers_uploaded"].name
-            with open(st.session_state["repo_path"] / headers_path, "wb") as f:
-                f.write(input_dict["headers_uploaded"].getbuffer())
+            save_uploaded_file(input_dict["headers_uploaded"], repo_path / headers_path)
 
         # Then initialize the project files by replacing placeholders
-        initialize_project(
-            repo_path=st.session_state["repo_path"],
+        modified_paths = [
+            repo_path / path
+            for path in (icon_path, ico_path, icns_path, welcome_path, headers_path)
+            if path
+        ]
+        modified_paths += initialize_project(
+            repo_path=repo_path,
             project_name=input_dict["project_name"],
             version=input_dict["project_version"],
             hide_code=input_dict["hide_code"],
@@ -652,35 +900,38 @@ def enqueue_pull_request(repo_url, personal_access_token, input_dict):
         )
 
         # Also, check if there is a README.md file and if so move it to the '.tools/docs' folder and create a new one with the project name
-        readme_path = st.session_state["repo_path"] / "README.md"
+        readme_path = repo_path / "README.md"
 
         # Check if README.md exists
         if readme_path.exists():
             # Check if it's the README from LabConstrictor template
             readme_content = readme_path.read_text(encoding="utf-8")
             if "# LabConstrictor" in readme_content:
-                docs_folder = st.session_state["repo_path"] / ".tools" / "docs"
+                docs_folder = repo_path / ".tools" / "docs"
                 docs_folder.mkdir(parents=True, exist_ok=True)
                 # Move the existing README.md to docs folder
                 shutil.move(str(readme_path), str(docs_folder / "README.md"))
+                modified_paths += [readme_path, docs_folder / "README.md"]
                 # Replace any occurence of '.tools/docs to . as we have moved the README.md there
-                replace_in_file(docs_folder / "README.md", ".tools/docs", ".")
+                replace_in_file(docs_folder / "README.md", {".tools/docs": "."})
 
                 # Create a new README.md with the project name
-                with open(readme_path, "w", encoding="utf-8") as f:
-                    f.write(f"# {input_dict['project_name']}\n\n")
-                    f.write("Welcome to CellPatcher!\n")
-                    f.write("This repository was initialised using LabConstrictor.\n")
-                    f.write(f"If you want to start using {input_dict['project_name']}, please go to the [How to Download and Install {input_dict['project_name']}?](#how-to-download-and-install-{input_dict['project_name'].lower()}) below.\n")
-                    f.write(f"> If you are the developer of {input_dict['project_name']}, please customise this README file.\n")
-                    f.write("\n")
-                    f.write(f"## How to Download and Install {input_dict['project_name']}?\n\n")
-                    f.write(f"The installer would only be available once {input_dict['project_name']} developer has created a release.\n")
-                    f.write(f"Please, go to [this page](.tools/docs/download_executable.md) and check if the installing instructions are there.\n")
-                    f.write(f"In case there is no documentation there, please [create an issue](https://github.com/{github_owner}/{github_repo_name}/issues) asking the developer to create a release.\n")
-                    f.write(f"## Documentation for {input_dict['project_name']}'s Developers\n\n")
-                    f.write("Internal documentation on how to upload notebooks or create executables is available in the [.tools/docs](.tools/docs/README.md) folder.\n")
-                    f.write("\n")
+                readme_text = (
+                    f"# {input_dict['project_name']}\n\n"
+                    "Welcome to CellPatcher!\n"
+                    "This repository was initialised using LabConstrictor.\n"
+                    f"If you want to start using {input_dict['project_name']}, please go to the [How to Download and Install {input_dict['project_name']}?](#how-to-download-and-install-{input_dict['project_name'].lower()}) below.\n"
+                    f"> If you are the developer of {input_dict['project_name']}, please customise this README file.\n"
+                    "\n"
+                    f"## How to Download and Install {input_dict['project_name']}?\n\n"
+                    f"The installer would only be available once {input_dict['project_name']} developer has created a release.\n"
+                    f"Please, go to [this page](.tools/docs/download_executable.md) and check if the installing instructions are there.\n"
+                    f"In case there is no documentation there, please [create an issue](https://github.com/{github_owner}/{github_repo_name}/issues) asking the developer to create a release.\n"
+                    f"## Documentation for {input_dict['project_name']}'s Developers\n\n"
+                    "Internal documentation on how to upload notebooks or create executables is available in the [.tools/docs](.tools/docs/README.md) folder.\n"
+                    "\n"
+                )
+                readme_path.write_text(readme_text, encoding="utf-8")
             
         # Create a pull request using GitHub CLI
         pr_title = f"Pull request for {input_dict['project_name']} initialisation"
@@ -689,10 +940,12 @@ def enqueue_pull_request(repo_url, personal_access_token, input_dict):
 
     elif input_dict["submission_mode"] == "update":
         welcome_template_synchronized = synchronize_welcome_template(
-            st.session_state["repo_path"]
+            repo_path
         )
+        modified_paths = []
         if welcome_template_synchronized:
-            st.write("Synchronized `.tools/templates/Welcome_template.ipynb`.")
+            log("Synchronized `.tools/templates/Welcome_template.ipynb`.")
+            modified_paths.append(repo_path / ".tools" / "templates" / "Welcome_template.ipynb")
 
         uploads = input_dict.get("queued_uploads")
         if not uploads:
@@ -703,39 +956,34 @@ def enqueue_pull_request(repo_url, personal_access_token, input_dict):
                 }
             ]
 
-        normalized_uploads = []
+        # Resolve, write and collect each upload in a single pass, without copying UploadedFile buffers into bytes first
         required_upload_keys = {"notebook_name", "notebook_bytes", "requirements_name", "requirements_bytes"}
+        notebook_names = []
         for upload in uploads:
-            if required_upload_keys <= set(upload.keys()):
-                normalized_uploads.append(upload)
+            is_queued_upload = required_upload_keys <= upload.keys()
+            if is_queued_upload:
+                notebook_name = upload["notebook_name"]
             elif "notebook_uploaded" in upload and "requirements_uploaded" in upload:
-                normalized_uploads.append(
-                    {
-                        "notebook_name": upload["notebook_uploaded"].name,
-                        "notebook_bytes": bytes(upload["notebook_uploaded"].getbuffer()),
-                        "requirements_name": upload["requirements_uploaded"].name,
-                        "requirements_bytes": bytes(upload["requirements_uploaded"].getbuffer()),
-                    }
-                )
+                notebook_name = upload["notebook_uploaded"].name
             else:
                 raise ValueError("Notebook submission payload is missing file content.")
 
-        notebook_names = []
-        for upload in normalized_uploads:
-            notebook_name = upload["notebook_name"]
             # The requirements file must be named 'requirements.yaml' to be correctly processed in the repo, but we can allow some flexibility in the upload naming and just rename it here
             requirements_name = "requirements.yaml" # upload["requirements_name"]
             notebook_names.append(notebook_name)
 
             notebook_path = (
-                st.session_state["repo_path"] / "notebooks" / Path(notebook_name).stem
+                repo_path / "notebooks" / Path(notebook_name).stem
             )
             notebook_path.mkdir(parents=True, exist_ok=True)
+            modified_paths.append(notebook_path)
 
-            with open(notebook_path / notebook_name, "wb") as f:
-                f.write(upload["notebook_bytes"])
-            with open(notebook_path / requirements_name, "wb") as f:
-                f.write(upload["requirements_bytes"])
+            if is_queued_upload:
+                (notebook_path / notebook_name).write_bytes(upload["notebook_bytes"])
+                (notebook_path / requirements_name).write_bytes(upload["requirements_bytes"])
+            else:
+                save_uploaded_file(upload["notebook_uploaded"], notebook_path / notebook_name)
+                save_uploaded_file(upload["requirements_uploaded"], notebook_path / requirements_name)
 
         if len(notebook_names) == 1:
             pr_title = f"Upload/Update notebook {notebook_names[0]}"
@@ -760,35 +1008,61 @@ def enqueue_pull_request(repo_url, personal_access_token, input_dict):
             commit_message += " and synchronize Welcome template"
 
     response = push_and_create_pr(
-        folder=st.session_state["repo_path"],
+        paths=modified_paths,
         branch_prefix="submission",
         commit_message=commit_message,
         pr_title=pr_title,
         pr_body=pr_body,
-        github_repo_url=repo_url,
+        username=username,
+        repository_id=repository_id,
         github_token=personal_access_token,
-        repo_path=st.session_state["repo_path"]
+        repo_path=repo_path,
+        log=log
     )
-    
-    st.write(f"🧹 Cleaning the repo {st.session_state['repo_path']}.")
-    shutil.rmtree(st.session_state["repo_path"], onerror=handle_remove_error)
-    st.write(f"✅ Cleaned up the repo.")
 
     if response is None:
-        st.write("❌ Finished!")
+        log("❌ Finished!")
     else:
-        st.write("🏆 Finished!")
-        st.write("### 👣 Next steps")
-        st.write("Everything went well and your pull request is ready.")
+        log("🏆 Finished!")
+        log("### 👣 Next steps")
+        log("Everything went well and your pull request is ready.")
         if input_dict["submission_mode"] == "initialize":
-            st.write(f"Please go back to [documentation]({repo_url}/blob/main/.tools/docs/initialise_repository.md) to know how to accept the Pull Request.")
+            log(f"Please go back to [documentation]({repo_url}/blob/main/.tools/docs/initialise_repository.md) to know how to accept the Pull Request.")
         else:
-            st.write(f"Please go back to [documentation]({repo_url}/blob/main/.tools/docs/accept_pull_request.md) to continue with the Notebook upload/update.")
-        st.write(f"If you want to go directly to the pull request, click here: {response['html_url']}")
-        st.write("After the pull request is accepted you can close this Streamlit app and start working on your project! 🚀")
+            log(f"Please go back to [documentation]({repo_url}/blob/main/.tools/docs/accept_pull_request.md) to continue with the Notebook upload/update.")
+        log(f"If you want to go directly to the pull request, click here: {response['url']}")
+        log("After the pull request is accepted you can close this Streamlit app and start working on your project! 🚀")
     
     return response
 
+@contextmanager
+def buffered_status_log(status):
+    """Yield a logger that keeps the progress lines locally and renders them once at the end."""
+    progress_lines = []
+
+    def log(message, transient=False):
+        # Transient messages mark the milestones (sync, push, pull request) and only move the status label
+        if transient:
+            status.update(label=message)
+        else:
+            progress_lines.append(message)
+
+    try:
+        yield log
+    except Exception:
+        status.update(label="Failed to create pull request", state="error")
+        raise
+    finally:
+        if progress_lines:
+            st.markdown("\n\n".join(progress_lines))
+
+def finish_pull_request_status(status, response):
+    """Set the final label and state of the status block once the pull request flow has returned."""
+    if response is None:
+        status.update(label="Pull request could not be created", state="error")
+    else:
+        status.update(label="Pull request created", state="complete")
+
 def mark_submission_dirty():
     st.session_state["ready_for_pr"] = False
 
@@ -971,7 +1245,9 @@ def render_initialize_view():
             if validate_repo_format(repo_url.strip()):
                 with st.status("Creating pull request...", expanded=True) as status:
                     try:
-                        enqueue_pull_request(repo_url.strip(), token.strip(), st.session_state["submitted_info"])
+                        with buffered_status_log(status) as log:
+                            response = enqueue_pull_request(repo_url.strip(), token.strip(), st.session_state["submitted_info"], log=log)
+                        finish_pull_request_status(status, response)
                     except Exception as e:
                         status.error(f"Failed to create pull request:\n{e}")
             else:
@@ -1139,7 +1415,9 @@ def render_update_view():
                         "submission_mode": "update",
                         "queued_uploads": list(queued_uploads),
                     }
-                    enqueue_pull_request(repo_url.strip(), token.strip(), submission_payload)
+                    with buffered_status_log(status) as log:
+                        response = enqueue_pull_request(repo_url.strip(), token.strip(), submission_payload, log=log)
+                    finish_pull_request_status(status, response)
                 # try:
                 #     enqueue_pull_request(repo_url.strip(), token.strip(), st.session_state["submitted_info"])
                 # except Exception as e: